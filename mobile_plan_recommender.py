@@ -1,54 +1,157 @@
 # Mobile Plan Recommender
+import atexit
 import json
+import operator
+import marshal
 import os
+import re
+import signal
 import sqlite3
-from typing import Dict, Any, Tuple, Optional
+import sys
+from dataclasses import astuple, dataclass, fields
+from datetime import datetime, timezone
+from types import FrameType
+from typing import Callable, Dict, Any, List, NamedTuple, Tuple, Optional
+
+_json_loads: Callable[[bytes], Any]
+try:  # optional C JSON parser; falls back to the standard library
+    import orjson  # type: ignore[import-not-found, unused-ignore]
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 PROGRAM_AUTHOR = "Nopporn Khongnongdaeng"
 STUDENT_ID = "30448348"
 PROGRAM_NAME = "Mobile Plan Recommender"
 
 PLANS_JSON = "plans.json"   #Randomly assigned Mobile Plans file
+PLANS_CACHE_SUFFIX = ".cache"  # parsed plans are cached next to the JSON file
+PLANS_CACHE_VERSION = 2  # bump whenever Plan's fields or the cache layout change so old caches are ignored
 DB_FILE = "usage_details.sqlite3" # SQLite database for usage details
 
+# Fixed screen text, built once and written with a single call
+BANNER = (
+    "=" * 60 + "\n"
+    f"Welcome to {PROGRAM_NAME}!\nBy {PROGRAM_AUTHOR} (Student ID: {STUDENT_ID})\n"
+    + "=" * 60 + "\n\n"
+)
+MENU = (
+    "Menu:\n"
+    "  1) Enter usage details\n"
+    "  2) Display current usage details\n"
+    "  3) Display plan costs\n"
+    "  4) Recommend best plan\n"
+    "  5) Save current usage (extension)\n"
+    "  6) Load usage for a person (extension)\n"
+    "  7) Show usage statistics (extension)\n"
+    "  8) Exit\n"
+)
+
+# SQL statements, kept together here so the schema and the queries are easy to read side by side
+SQL_CREATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage_details (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    person_name TEXT NOT NULL,
+    minutes INTEGER NOT NULL,
+    data_gb REAL NOT NULL,
+    roaming_required INTEGER NOT NULL CHECK(roaming_required IN (0,1)),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+-- Lets load_usage seek straight to a person's latest row (ties on created_at go to the higher id)
+-- instead of scanning and sorting; replaces the earlier index that had no id tie-break
+DROP INDEX IF EXISTS idx_usage_person_time;
+CREATE INDEX IF NOT EXISTS idx_usage_person_latest ON usage_details(person_name, created_at, id);
+"""
+# The index is created last, so its presence means the whole schema is in place
+SQL_SCHEMA_READY = "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_usage_person_latest'"
+SQL_INSERT_USAGE = "INSERT INTO usage_details (person_name, minutes, data_gb, roaming_required, created_at) VALUES (?,?,?,?,?)"
+SQL_SELECT_LAST = "SELECT minutes, data_gb, roaming_required FROM usage_details WHERE person_name = ? ORDER BY created_at DESC, id DESC LIMIT 1"
+SQL_STATS_AGG = (
+    "SELECT COUNT(*), AVG(minutes), AVG(data_gb), MIN(minutes), MAX(minutes),"
+    " MIN(data_gb), MAX(data_gb), SUM(roaming_required) FROM usage_details"
+)
+
+_CONN: Optional[sqlite3.Connection] = None  # shared connection, opened lazily
+_CONN_PATH: Optional[str] = None
+
+PENDING_FLUSH_SIZE = 32  # queued usage rows are written once this many build up
+_pending: Dict[str, List[Tuple[str, int, float, int, str]]] = {}  # db_path -> rows queued, not yet written
+
 #Utility: input helpers
+_FLOAT_RE = re.compile(r"[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?")
+_FLOAT_WORDS = ("inf", "infinity", "nan")
+
+def _parse_int(raw: str) -> Optional[int]:
+    """Parse an int without raising for ordinary bad input; None if invalid."""
+    digits = raw[1:] if raw[:1] in ("-", "+") else raw
+    # Plain digits, or rare forms like 1_000; int() can still refuse very long
+    # digit strings (Python's int/str conversion limit), so keep it guarded
+    if digits.isdecimal() or "_" in digits:
+        try:
+            return int(raw)
+        except ValueError:
+            return None
+    return None
+
+def _parse_float(raw: str) -> Optional[float]:
+    """Parse a float without raising for ordinary bad input; None if invalid."""
+    if _FLOAT_RE.fullmatch(raw):
+        return float(raw)
+    if "_" in raw or not raw.isascii() or raw.lstrip("+-").lower() in _FLOAT_WORDS:
+        try:
+            return float(raw)
+        except ValueError:
+            return None
+    return None
+
 def input_int(prompt: str, minimum: int = 0) -> int:
     """Prompt until the user enters a valid integer >= minimum."""
     while True:
-        raw = input(prompt).strip()
-        try:
-            value = int(raw)
-            if value < minimum:
-                print(f"Please enter a number >= {minimum}.\n")
-                continue
-            return value
-        except ValueError:
+        value = _parse_int(input(prompt).strip())
+        if value is None:
             print("Invalid number. Please try again.\n")
+            continue
+        if value < minimum:
+            print(f"Please enter a number >= {minimum}.\n")
+            continue
+        return value
 
 def input_float(prompt: str, minimum: float = 0.0) -> float:
     """Prompt until the user enters a valid float >= minimum."""
     while True:
-        raw = input(prompt).strip()
-        try:
-            value = float(raw)
-            if value < minimum:
-                print(f"Please enter a number >= {minimum}.\n")
-                continue
-            return value
-        except ValueError:
+        value = _parse_float(input(prompt).strip())
+        if value is None:
             print("Invalid number. Please try again.\n")
+            continue
+        if value < minimum:
+            print(f"Please enter a number >= {minimum}.\n")
+            continue
+        return value
+
+_YES_NO = {"y": True, "yes": True, "n": False, "no": False}
 
 def input_yes_no(prompt: str) -> bool:
     """Return True for yes, False for no."""
     while True:
-        raw = input(prompt + " (y/n): ").strip().lower()
-        if raw in ("y", "yes"): return True
-        if raw in ("n", "no"): return False
+        answer = _YES_NO.get(input(prompt + " (y/n): ").strip().lower())
+        if answer is not None:
+            return answer
         print("Please answer y or n.\n")
 
 #Plans: load & validate
-def load_plans(path: str) -> Dict[str, Dict[str, Any]]:
-    """Load plans from JSON. Returns a dict keyed by plan_code.
+@dataclass(frozen=True, slots=True)
+class Plan:
+    provider: str
+    plan_name: str
+    base_cost: float
+    included_minutes: int
+    included_data_gb: float
+    cost_per_minute: float
+    cost_per_gb: float
+    roaming_included: bool
+
+def load_plans(path: str) -> Dict[str, Plan]:
+    """Load plans from JSON. Returns a dict of Plan keyed by plan_code.
 
     Schema per plan:
     {
@@ -62,242 +165,408 @@ def load_plans(path: str) -> Dict[str, Dict[str, Any]]:
       "cost_per_gb": 8.0,
       "roaming_included": false
     }
+
+    The parsed result (including warnings about skipped entries, which are
+    shown again) is cached in path + PLANS_CACHE_SUFFIX and reused while
+    the JSON file's modification time and size are unchanged.
     """
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        st = os.stat(path)
     except FileNotFoundError:
         print(f"WARNING: '{path}' not found. Please create it with the five plans from Moodle.\n")
         return {}
-    except json.JSONDecodeError as ex:
+    key = (PLANS_CACHE_VERSION, st.st_mtime_ns, st.st_size)
+    cache_path = path + PLANS_CACHE_SUFFIX
+    parsed = _read_plans_cache(cache_path, key)
+    if parsed is None:
+        parsed = _parse_plans(path)
+        if parsed is None:
+            return {}
+        _write_plans_cache(cache_path, key, *parsed)
+    plans, warnings = parsed
+    for warning in warnings:
+        print(warning)
+    if len(plans) < 5:
+        print("NOTE: Fewer than five valid plans were loaded. Make sure you copied all five from Moodle.\n")
+    return plans
+
+def _parse_plans(path: str) -> Optional[Tuple[Dict[str, Plan], List[str]]]:
+    """Parse and validate the plans JSON file into (plans, warnings); None if it is not valid JSON."""
+    try:
+        with open(path, "rb") as f:
+            data = _json_loads(f.read())
+    except json.JSONDecodeError as ex:  # orjson.JSONDecodeError subclasses this
         print(f"ERROR: Could not parse '{path}': {ex}\n")
-        return {}
+        return None
 
-    plans: Dict[str, Dict[str, Any]] = {}
+    plans: Dict[str, Plan] = {}
+    warnings: List[str] = []
     for item in data.get("plans", []):
         # Basic validation and coercion
         try:
             code = str(item["plan_code"]).strip()
-            plans[code] = {
-                "provider": str(item["provider"]).strip(),
-                "plan_name": str(item["plan_name"]).strip(),
-                "base_cost": float(item["base_cost"]),
-                "included_minutes": int(item["included_minutes"]),
-                "included_data_gb": float(item["included_data_gb"]),
-                "cost_per_minute": float(item["cost_per_minute"]),
-                "cost_per_gb": float(item["cost_per_gb"]),
-                "roaming_included": bool(item["roaming_included"]),
+            plans[code] = Plan(
+                provider=str(item["provider"]).strip(),
+                plan_name=str(item["plan_name"]).strip(),
+                base_cost=float(item["base_cost"]),
+                included_minutes=int(item["included_minutes"]),
+                included_data_gb=float(item["included_data_gb"]),
+                cost_per_minute=float(item["cost_per_minute"]),
+                cost_per_gb=float(item["cost_per_gb"]),
+                roaming_included=bool(item["roaming_included"]),
                 # Any unknown fields are ignored.
-            }
+            )
         except (KeyError, ValueError, TypeError) as ex:
-            print(f"WARNING: Skipping invalid plan entry: {item} (reason: {ex})")
-    if len(plans) < 5:
-        print("NOTE: Fewer than five valid plans were loaded. Make sure you copied all five from Moodle.\n")
-    return plans
+            warnings.append(f"WARNING: Skipping invalid plan entry: {item} (reason: {ex})")
+    return plans, warnings
+
+# The cache is written with marshal and holds only plain values; nothing read from it is executed:
+# {"key": (version, mtime_ns, size), "plans": [(plan_code, *Plan fields), ...], "warnings": [str, ...]}
+_PLAN_FIELD_TYPES = tuple(f.type for f in fields(Plan))
+
+def _plan_from_cache_row(row: Tuple[Any, ...]) -> Tuple[str, Plan]:
+    """Rebuild (plan_code, Plan) from a cache row; ValueError unless every field has exactly Plan's type."""
+    code, *values = row
+    if (type(code) is not str or len(values) != len(_PLAN_FIELD_TYPES)
+            or any(type(v) is not t for v, t in zip(values, _PLAN_FIELD_TYPES))):
+        raise ValueError(f"cached plan row does not match Plan: {row!r}")
+    return code, Plan(*values)
+
+def _read_plans_cache(cache_path: str, key: Tuple[int, int, int]) -> Optional[Tuple[Dict[str, Plan], List[str]]]:
+    """Return cached (plans, warnings) if the cache matches key; None on a miss or unreadable cache."""
+    try:
+        with open(cache_path, "rb") as f:
+            cached = marshal.load(f)
+        if cached["key"] != key:
+            return None
+        plans = dict(_plan_from_cache_row(row) for row in cached["plans"])
+        warnings = cached["warnings"]
+        if not all(type(w) is str for w in warnings):
+            return None
+        return plans, warnings
+    except Exception:  # the cache is best-effort; anything unreadable just means a re-parse
+        return None
+
+def _write_plans_cache(cache_path: str, key: Tuple[int, int, int], plans: Dict[str, Plan], warnings: List[str]) -> None:
+    rows = [(code, *astuple(plan)) for code, plan in plans.items()]
+    try:
+        with open(cache_path, "wb") as f:
+            marshal.dump({"key": key, "plans": rows, "warnings": warnings}, f)
+    except OSError:
+        pass  # caching is best-effort; a read-only folder just means no cache
+
+class PlanTable(NamedTuple):
+    """Plans laid out column-wise (one list per field, same order as codes)."""
+    codes: List[str]
+    providers: List[str]
+    names: List[str]
+    base: List[float]
+    inc_min: List[int]
+    inc_gb: List[float]
+    cpm: List[float]
+    cpg: List[float]
+    roam: List[bool]
+    roaming_idx: List[int]  # positions of plans that include roaming
+    # find(minutes, data_gb) -> (plan index, cost) over all plans / only roaming plans;
+    # find_best_roaming must not be called when roaming_idx is empty (no eligible plan)
+    find_best_any: Callable[[int, float], Tuple[int, float]]
+    find_best_roaming: Callable[[int, float], Tuple[int, float]]
+
+def _set_bits(mask: int) -> List[int]:
+    """Positions of the set bits in mask, lowest first."""
+    positions = []
+    while mask:
+        low = mask & -mask
+        positions.append(low.bit_length() - 1)
+        mask ^= low
+    return positions
+
+def build_plan_table(plans: Dict[str, Plan]) -> PlanTable:
+    """Flatten the plans dict into a PlanTable once, so menu actions skip per-plan attribute lookups."""
+    rows = plans.values()
+    base = [p.base_cost for p in rows]
+    inc_min = [p.included_minutes for p in rows]
+    inc_gb = [p.included_data_gb for p in rows]
+    cpm = [p.cost_per_minute for p in rows]
+    cpg = [p.cost_per_gb for p in rows]
+    roam = [p.roaming_included for p in rows]
+    roaming_mask = sum(1 << i for i, r in enumerate(roam) if r)  # bit i set when plan i includes roaming
+    roaming_idx = _set_bits(roaming_mask)
+    coeffs = list(zip(range(len(plans)), base, inc_min, inc_gb, cpm, cpg))
+    return PlanTable(
+        codes=list(plans),
+        providers=[p.provider for p in rows],
+        names=[p.plan_name for p in rows],
+        base=base,
+        inc_min=inc_min,
+        inc_gb=inc_gb,
+        cpm=cpm,
+        cpg=cpg,
+        roam=roam,
+        roaming_idx=roaming_idx,
+        find_best_any=best_plan_finder(coeffs),
+        find_best_roaming=best_plan_finder([coeffs[i] for i in roaming_idx]),
+    )
 
 #Cost calculation
-def cost_for_usage(plan: Dict[str, Any], minutes: int, data_gb: float) -> float:
-    extra_minutes = max(0, minutes - int(plan["included_minutes"]))
-    extra_data_gb = max(0.0, data_gb - float(plan["included_data_gb"]))
-    return float(plan["base_cost"]) + extra_minutes * float(plan["cost_per_minute"]) + extra_data_gb * float(plan["cost_per_gb"])
+# Plan fields are already coerced to int/float by load_plans, so no casts here.
+def plan_cost(base: float, inc_min: int, inc_gb: float, cpm: float, cpg: float, minutes: int, data_gb: float) -> float:
+    """Monthly cost of one plan (given its coefficients) for one usage profile."""
+    return base + max(0, minutes - inc_min) * cpm + max(0.0, data_gb - inc_gb) * cpg
+
+def costs_for_usage(table: PlanTable, minutes: int, data_gb: float) -> List[float]:
+    """Monthly cost of every plan for one usage profile, in table order."""
+    return [
+        plan_cost(base, inc_min, inc_gb, cpm, cpg, minutes, data_gb)
+        for base, inc_min, inc_gb, cpm, cpg in zip(table.base, table.inc_min, table.inc_gb, table.cpm, table.cpg)
+    ]
+
+def best_plan_finder(coeffs: List[Tuple[int, float, int, float, float, float]]) -> Callable[[int, float], Tuple[int, float]]:
+    """Return find(minutes, data_gb) -> (plan index, cost) over a fixed set of plans.
+
+    coeffs holds (index, base, inc_min, inc_gb, cpm, cpg) for each candidate
+    plan, bound once so each call only prices those plans. coeffs must not be empty.
+    """
+    by_cost = operator.itemgetter(1)
+
+    def find_best(minutes: int, data_gb: float) -> Tuple[int, float]:
+        # min() keeps the first of equal costs
+        return min(
+            ((i, plan_cost(base, inc_min, inc_gb, cpm, cpg, minutes, data_gb))
+             for i, base, inc_min, inc_gb, cpm, cpg in coeffs),
+            key=by_cost,
+        )
+
+    return find_best
 
 #SQLite helpers (extension)
+def get_conn(db_path: str = DB_FILE) -> sqlite3.Connection:
+    """Return the shared connection, opening it on first use (or if the path changes)."""
+    global _CONN, _CONN_PATH
+    if _CONN is None or _CONN_PATH != db_path:
+        close_conn()
+        con = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")  # in WAL mode, commits no longer wait on fsync
+        con.execute("PRAGMA temp_store=MEMORY")
+        con.execute("PRAGMA cache_size=-20000")
+        _CONN, _CONN_PATH = con, db_path
+    return _CONN
+
+def close_conn() -> None:
+    """Close the shared connection (registered to run at exit)."""
+    global _CONN, _CONN_PATH
+    if _CONN is not None:
+        _CONN.close()
+    _CONN, _CONN_PATH = None, None
+
+atexit.register(close_conn)
+
 def init_db(db_path: str = DB_FILE) -> None:
-    con = sqlite3.connect(db_path)
-    cur = con.cursor()
-    cur.execute(
-        """CREATE TABLE IF NOT EXISTS usage_details (
-               id INTEGER PRIMARY KEY AUTOINCREMENT,
-               person_name TEXT NOT NULL,
-               minutes INTEGER NOT NULL,
-               data_gb REAL NOT NULL,
-               roaming_required INTEGER NOT NULL CHECK(roaming_required IN (0,1)),
-               created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-           )"""
-    )
-    con.commit()
-    con.close()
+    con = get_conn(db_path)
+    if con.execute(SQL_SCHEMA_READY).fetchone() is None:
+        con.executescript(SQL_CREATE_SCHEMA)
+
+def usage_row(person_name: str, minutes: int, data_gb: float, roaming: bool) -> Tuple[str, int, float, int, str]:
+    """Build an insert row stamped with the current UTC time (same format as CURRENT_TIMESTAMP)."""
+    created_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    return person_name, minutes, data_gb, 1 if roaming else 0, created_at
 
 def save_usage(person_name: str, minutes: int, data_gb: float, roaming: bool, db_path: str = DB_FILE) -> None:
-    con = sqlite3.connect(db_path)
-    cur = con.cursor()
-    cur.execute(
-        "INSERT INTO usage_details (person_name, minutes, data_gb, roaming_required) VALUES (?,?,?,?)",
-        (person_name, minutes, data_gb, 1 if roaming else 0),
-    )
-    con.commit()
-    con.close()
+    get_conn(db_path).execute(SQL_INSERT_USAGE, usage_row(person_name, minutes, data_gb, roaming))
+
+def save_usage_many(rows: List[Tuple[str, int, float, int, str]], db_path: str = DB_FILE) -> None:
+    """Insert (person_name, minutes, data_gb, roaming_required, created_at) rows in one transaction."""
+    con = get_conn(db_path)
+    con.execute("BEGIN IMMEDIATE")  # take the write lock up front rather than upgrading mid-batch
+    try:
+        con.executemany(SQL_INSERT_USAGE, rows)
+    except BaseException:  # includes SystemExit from a signal and KeyboardInterrupt
+        con.execute("ROLLBACK")
+        raise
+    con.execute("COMMIT")
+
+def queue_usage(person_name: str, minutes: int, data_gb: float, roaming: bool, db_path: str = DB_FILE) -> None:
+    """Buffer a usage row, timestamped now; the buffer is written in one batch when full, before reads and at exit."""
+    rows = _pending.setdefault(db_path, [])
+    rows.append(usage_row(person_name, minutes, data_gb, roaming))
+    if len(rows) >= PENDING_FLUSH_SIZE:
+        flush_usage(db_path)
+
+def flush_usage(db_path: str = DB_FILE) -> None:
+    """Write the rows queued for db_path (only those) in one batch."""
+    rows = _pending.get(db_path)
+    if rows:
+        save_usage_many(rows, db_path)
+        rows.clear()
+
+def flush_all_usage() -> None:
+    for db_path in list(_pending):
+        flush_usage(db_path)
+
+atexit.register(flush_all_usage)  # atexit runs LIFO, so this happens before close_conn
 
 def load_usage(person_name: str, db_path: str = DB_FILE) -> Optional[Tuple[int, float, bool]]:
-    con = sqlite3.connect(db_path)
-    cur = con.cursor()
-    cur.execute(
-        "SELECT minutes, data_gb, roaming_required FROM usage_details WHERE person_name = ? ORDER BY created_at DESC LIMIT 1",
-        (person_name,),
-    )
-    row = cur.fetchone()
-    con.close()
+    flush_usage(db_path)
+    row = get_conn(db_path).execute(SQL_SELECT_LAST, (person_name,)).fetchone()
     if row:
         minutes, data_gb, roaming_int = row
         return int(minutes), float(data_gb), bool(roaming_int)
     return None
 
 def show_stats(db_path: str = DB_FILE) -> None:
-    con = sqlite3.connect(db_path)
-    cur = con.cursor()
-    # Basic descriptive stats
-    cur.execute("SELECT COUNT(*), AVG(minutes), AVG(data_gb) FROM usage_details")
-    count, avg_min, avg_gb = cur.fetchone()
-    cur.execute("SELECT MIN(minutes), MAX(minutes), MIN(data_gb), MAX(data_gb) FROM usage_details")
-    min_min, max_min, min_gb, max_gb = cur.fetchone()
-    cur.execute("SELECT SUM(roaming_required), COUNT(*) FROM usage_details")
-    roam_count, total = cur.fetchone()
-    con.close()
+    flush_usage(db_path)
+    # Basic descriptive stats, all from a single scan
+    count, avg_min, avg_gb, min_min, max_min, min_gb, max_gb, roam_count = get_conn(db_path).execute(SQL_STATS_AGG).fetchone()
     if not count:
         print("No saved usage yet.\n")
         return
-    roaming_pct = (roam_count or 0) * 100.0 / max(1, total or 1)
-    print("\n== Saved Usage Statistics ==")
-    print(f"Total records: {count}")
-    print(f"Average minutes: {avg_min:.1f}, average data: {avg_gb:.2f} GB")
-    print(f"Minutes range: {min_min} - {max_min}; Data range: {min_gb:.2f} - {max_gb:.2f} GB")
-    print(f"Roaming required: {roaming_pct:.1f}% of saved profiles\n")
+    roaming_pct = (roam_count or 0) * 100.0 / count
+    sys.stdout.write(
+        "\n== Saved Usage Statistics ==\n"
+        f"Total records: {count}\n"
+        f"Average minutes: {avg_min:.1f}, average data: {avg_gb:.2f} GB\n"
+        f"Minutes range: {min_min} - {max_min}; Data range: {min_gb:.2f} - {max_gb:.2f} GB\n"
+        f"Roaming required: {roaming_pct:.1f}% of saved profiles\n\n"
+    )
 
 #Menu handlers
 def display_current_usage(current: Dict[str, Any]) -> None:
     if not current:
         print("Current usage: (not set yet)\n")
         return
-    print("Current usage:")
-    print(f"  Person: {current.get('person_name','(Anonymous)')}")
-    print(f"  Minutes per month: {current['minutes']}")
-    print(f"  Data per month: {current['data_gb']} GB")
-    print(f"  International roaming required: {'Yes' if current['roaming_required'] else 'No'}\n")
+    sys.stdout.write(
+        "Current usage:\n"
+        f"  Person: {current.get('person_name','(Anonymous)')}\n"
+        f"  Minutes per month: {current['minutes']}\n"
+        f"  Data per month: {current['data_gb']} GB\n"
+        f"  International roaming required: {'Yes' if current['roaming_required'] else 'No'}\n\n"
+    )
 
-def display_plan_costs(plans: Dict[str, Dict[str, Any]], current: Dict[str, Any]) -> None:
+_format_cost_row = "{}: {} - {} -> ${:.2f} {}".format
+
+def display_plan_costs(table: PlanTable, current: Dict[str, Any]) -> None:
     if not current:
         print("Please enter usage details first.\n")
         return
-    if not plans:
+    if not table.codes:
         print("No plans loaded. Create 'plans.json' with the five plans from Moodle.\n")
         return
-    print("\n== Plan Costs for Current Usage ==")
-    for code, plan in plans.items():
-        monthly = cost_for_usage(plan, current['minutes'], current['data_gb'])
-        eligible = True
-        if current['roaming_required'] and not plan['roaming_included']:
-            eligible = False
+    costs = costs_for_usage(table, current['minutes'], current['data_gb'])
+    roaming_required = current['roaming_required']
+    lines = ["\n== Plan Costs for Current Usage =="]
+    for i, code in enumerate(table.codes):
+        eligible = not roaming_required or table.roam[i]
         tag = "(eligible)" if eligible else "(NOT eligible for required roaming)"
-        full_name = f"{plan['provider']} - {plan['plan_name']}"
-        print(f"{code}: {full_name} -> ${monthly:.2f} {tag}")
-    print()
+        lines.append(_format_cost_row(code, table.providers[i], table.names[i], costs[i], tag))
+    sys.stdout.write("\n".join(lines) + "\n\n")
 
-def recommend_best_plan(plans: Dict[str, Dict[str, Any]], current: Dict[str, Any]) -> None:
+def recommend_best_plan(table: PlanTable, current: Dict[str, Any]) -> None:
     if not current:
         print("Please enter usage details first.\n")
         return
-    if not plans:
+    if not table.codes:
         print("No plans loaded. Create 'plans.json' with the five plans from Moodle.\n")
         return
-    best_code = None
-    best_cost = None
-    for code, plan in plans.items():
-        if current['roaming_required'] and not plan['roaming_included']:
-            continue  # skip plans that don't meet roaming requirement
-        monthly = cost_for_usage(plan, current['minutes'], current['data_gb'])
-        if best_cost is None or monthly < best_cost:
-            best_cost = monthly
-            best_code = code
-    if best_code is None:
+    if current['roaming_required'] and not table.roaming_idx:  # no roaming plan at all
         print("No plan meets the requirement for international roaming.\n")
         return
-    plan = plans[best_code]
+    find_best = table.find_best_roaming if current['roaming_required'] else table.find_best_any
+    best_idx, best_cost = find_best(current['minutes'], current['data_gb'])
     print("\n== Recommended Plan ==")
-    print(f"{plan['provider']} - {plan['plan_name']} (code: {best_code})")
+    print(f"{table.providers[best_idx]} - {table.names[best_idx]} (code: {table.codes[best_idx]})")
     print(f"Estimated monthly cost: ${best_cost:.2f}")
-    print(f"Includes roaming: {'Yes' if plan['roaming_included'] else 'No'}\n")
+    print(f"Includes roaming: {'Yes' if table.roam[best_idx] else 'No'}\n")
 
 #Main loop 
+def _exit_on_signal(signum: int, frame: Optional[FrameType]) -> None:
+    raise SystemExit(128 + signum)
+
 def main() -> None:
-    print("="*60)
-    print(f"Welcome to {PROGRAM_NAME}!\nBy {PROGRAM_AUTHOR} (Student ID: {STUDENT_ID})")
-    print("="*60 + "\n")
+    sys.stdout.write(BANNER)
 
     # Load plans and init DB (extension)
     plans = load_plans(PLANS_JSON)
+    table = build_plan_table(plans)
     init_db(DB_FILE)
 
     current_usage: Dict[str, Any] = {}  # will hold person_name, minutes, data_gb, roaming_required
 
-    while True:
-        # Always show current usage at the top (also has its own menu item)
-        display_current_usage(current_usage)
-        print("Menu:")
-        print("  1) Enter usage details")
-        print("  2) Display current usage details")
-        print("  3) Display plan costs")
-        print("  4) Recommend best plan")
-        print("  5) Save current usage (extension)")
-        print("  6) Load usage for a person (extension)")
-        print("  7) Show usage statistics (extension)")
-        print("  8) Exit")
-
-        choice = input("Choose an option (1-8): ").strip()
-        print()  # visual spacing
-
-        if choice == "1":
-            person_name = input("Enter person's name (for saving later; can be blank): ").strip() or "(Anonymous)"
-            minutes = input_int("Typical monthly call minutes: ", minimum=0)
-            data_gb = input_float("Typical monthly data usage (GB): ", minimum=0.0)
-            roaming = input_yes_no("Require international roaming?")
+    # Menu actions; a handler returns True to end the program
+    def enter_usage() -> None:
+        nonlocal current_usage
+        person_name = input("Enter person's name (for saving later; can be blank): ").strip() or "(Anonymous)"
+        minutes = input_int("Typical monthly call minutes: ", minimum=0)
+        data_gb = input_float("Typical monthly data usage (GB): ", minimum=0.0)
+        roaming = input_yes_no("Require international roaming?")
+        current_usage = {
+            "person_name": person_name,
+            "minutes": minutes,
+            "data_gb": data_gb,
+            "roaming_required": roaming,
+        }
+        print("Saved current usage details.\n")
+
+    def save_current() -> None:
+        if not current_usage:
+            print("Please enter usage details first.\n")
+        else:
+            queue_usage(current_usage['person_name'], current_usage['minutes'], current_usage['data_gb'], current_usage['roaming_required'])
+            print("Usage details queued; they are written to SQLite before the next load/statistics view and on exit.\n")
+
+    def load_person() -> None:
+        nonlocal current_usage
+        name = input("Load usage for which person name? ").strip()
+        loaded = load_usage(name)
+        if loaded is None:
+            print("No saved usage found for that name.\n")
+        else:
+            minutes, data_gb, roaming = loaded
             current_usage = {
-                "person_name": person_name,
+                "person_name": name,
                 "minutes": minutes,
                 "data_gb": data_gb,
                 "roaming_required": roaming,
             }
-            print("Saved current usage details.\n")
+            print("Loaded usage details into current profile.\n")
 
-        elif choice == "2":
+    def exit_program() -> bool:
+        print("Thank you for using the Mobile Plan Recommender. Goodbye!\n")
+        return True
+
+    handlers: Dict[str, Callable[[], Optional[bool]]] = {
+        "1": enter_usage,
+        "2": lambda: display_current_usage(current_usage),
+        "3": lambda: display_plan_costs(table, current_usage),
+        "4": lambda: recommend_best_plan(table, current_usage),
+        "5": save_current,
+        "6": load_person,
+        "7": show_stats,
+        "8": exit_program,
+    }
+
+    # Closing the terminal (SIGHUP) or a kill (SIGTERM) would skip atexit; exit normally instead
+    for sig_name in ("SIGTERM", "SIGHUP"):  # SIGHUP does not exist on Windows
+        sig = getattr(signal, sig_name, None)
+        if sig is not None:
+            signal.signal(sig, _exit_on_signal)
+
+    try:
+        while True:
+            # Always show current usage at the top (also has its own menu item)
             display_current_usage(current_usage)
+            sys.stdout.write(MENU)
 
-        elif choice == "3":
-            display_plan_costs(plans, current_usage)
-
-        elif choice == "4":
-            recommend_best_plan(plans, current_usage)
-
-        elif choice == "5":
-            if not current_usage:
-                print("Please enter usage details first.\n")
-            else:
-                save_usage(current_usage['person_name'], current_usage['minutes'], current_usage['data_gb'], current_usage['roaming_required'])
-                print("Usage details saved to SQLite.\n")
-
-        elif choice == "6":
-            name = input("Load usage for which person name? ").strip()
-            loaded = load_usage(name)
-            if loaded is None:
-                print("No saved usage found for that name.\n")
-            else:
-                minutes, data_gb, roaming = loaded
-                current_usage = {
-                    "person_name": name,
-                    "minutes": minutes,
-                    "data_gb": data_gb,
-                    "roaming_required": roaming,
-                }
-                print("Loaded usage details into current profile.\n")
-
-        elif choice == "7":
-            show_stats()
-
-        elif choice == "8":
-            print("Thank you for using the Mobile Plan Recommender. Goodbye!\n")
-            break
+            choice = input("Choose an option (1-8): ").strip()
+            print()  # visual spacing
 
-        else:
-            print("Invalid choice. Please pick 1-8.\n")
+            handler = handlers.get(choice)
+            if handler is None:
+                print("Invalid choice. Please pick 1-8.\n")
+            elif handler():
+                break
+    finally:
+        flush_all_usage()  # however the loop ends, write any queued rows
 
 if __name__ == "__main__":
     main()